@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import argparse
+import mmap
+import re
 import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 
 OUTPUT_PATH = Path("answers_exam_style.pdf")
 
@@ -56,6 +61,10 @@ class TrueTypeFont:
         self.num_glyphs = self._read_maxp()
         self.advance_widths = self._read_hmtx()
         self.cmap = self._read_cmap()
+        # Pair kerning flattened once: (left_gid << 16 | right_gid) -> adjustment in font units.
+        # GPOS PairPos wins over the legacy kern table for pairs present in both.
+        self.kerning = self._read_kern()
+        self.kerning.update(self._read_gpos_kerning())
 
         self.used_gids: set[int] = set()
         # IMPORTANT: record which Unicode codepoint we intended for each GID.
@@ -164,45 +173,750 @@ class TrueTypeFont:
             pos += 12
         return cmap
 
+    def _read_kern(self) -> Dict[int, int]:
+        """Horizontal format 0 pairs from the legacy kern table (Microsoft or Apple header)."""
+        pairs: Dict[int, int] = {}
+        if "kern" not in self.tables:
+            return pairs
+        offset, _ = self.tables["kern"]
+        version = struct.unpack(">H", self.data[offset : offset + 2])[0]
+        if version == 0:
+            num_tables = struct.unpack(">H", self.data[offset + 2 : offset + 4])[0]
+            pos = offset + 4
+        else:
+            num_tables = struct.unpack(">I", self.data[offset + 4 : offset + 8])[0]
+            pos = offset + 8
+        for _ in range(num_tables):
+            if version == 0:
+                length, coverage = struct.unpack(">HH", self.data[pos + 2 : pos + 6])
+                fmt = coverage >> 8
+                horizontal = coverage & 0x7 == 0x1  # horizontal, not minimum, not cross-stream
+                header = 6
+            else:
+                length, coverage = struct.unpack(">IH", self.data[pos : pos + 6])
+                fmt = coverage & 0xFF
+                horizontal = coverage & 0xE000 == 0  # not vertical, cross-stream or variation
+                header = 8
+            if fmt == 0 and horizontal:
+                n_pairs = struct.unpack(">H", self.data[pos + header : pos + header + 2])[0]
+                records = pos + header + 8
+                for left, right, value in struct.iter_unpack(">HHh", self.data[records : records + n_pairs * 6]):
+                    if value:
+                        pairs[left << 16 | right] = value
+            pos += length
+        return pairs
+
+    def _read_coverage(self, offset: int) -> List[int]:
+        fmt, count = struct.unpack(">HH", self.data[offset : offset + 4])
+        if fmt == 1:
+            return list(struct.unpack(">" + "H" * count, self.data[offset + 4 : offset + 4 + count * 2]))
+        glyphs: List[int] = []
+        for start, end, _ in struct.iter_unpack(">HHH", self.data[offset + 4 : offset + 4 + count * 6]):
+            glyphs.extend(range(start, end + 1))
+        return glyphs
+
+    def _read_class_def(self, offset: int) -> Dict[int, int]:
+        fmt = struct.unpack(">H", self.data[offset : offset + 2])[0]
+        classes: Dict[int, int] = {}
+        if fmt == 1:
+            start, count = struct.unpack(">HH", self.data[offset + 2 : offset + 6])
+            values = struct.unpack(">" + "H" * count, self.data[offset + 6 : offset + 6 + count * 2])
+            for i, cls in enumerate(values):
+                if cls:
+                    classes[start + i] = cls
+            return classes
+        count = struct.unpack(">H", self.data[offset + 2 : offset + 4])[0]
+        for start, end, cls in struct.iter_unpack(">HHH", self.data[offset + 4 : offset + 4 + count * 6]):
+            if cls:
+                for gid in range(start, end + 1):
+                    classes[gid] = cls
+        return classes
+
+    def _read_gpos_kerning(self) -> Dict[int, int]:
+        """
+        Flatten the PairPos lookups behind GPOS 'kern' features into first-glyph XAdvance
+        adjustments. Earlier subtables win, matching how a shaper applies them.
+        """
+        pairs: Dict[int, int] = {}
+        if "GPOS" not in self.tables:
+            return pairs
+        gpos, _ = self.tables["GPOS"]
+        feature_list, lookup_list = struct.unpack(">HH", self.data[gpos + 6 : gpos + 10])
+        feature_list += gpos
+        lookup_list += gpos
+
+        lookup_indices: set[int] = set()
+        feature_count = struct.unpack(">H", self.data[feature_list : feature_list + 2])[0]
+        for i in range(feature_count):
+            record = feature_list + 2 + i * 6
+            if self.data[record : record + 4] != b"kern":
+                continue
+            feature = feature_list + struct.unpack(">H", self.data[record + 4 : record + 6])[0]
+            count = struct.unpack(">H", self.data[feature + 2 : feature + 4])[0]
+            lookup_indices.update(struct.unpack(">" + "H" * count, self.data[feature + 4 : feature + 4 + count * 2]))
+
+        for index in sorted(lookup_indices):
+            lookup = lookup_list + struct.unpack(">H", self.data[lookup_list + 2 + index * 2 : lookup_list + 4 + index * 2])[0]
+            lookup_type, _, sub_count = struct.unpack(">HHH", self.data[lookup : lookup + 6])
+            for j in range(sub_count):
+                sub = lookup + struct.unpack(">H", self.data[lookup + 6 + j * 2 : lookup + 8 + j * 2])[0]
+                sub_type = lookup_type
+                if sub_type == 9:  # Extension: real subtable lives behind a 32-bit offset
+                    sub_type, ext_offset = struct.unpack(">HI", self.data[sub + 2 : sub + 8])
+                    sub += ext_offset
+                if sub_type == 2:
+                    self._read_pair_pos(sub, pairs)
+        return pairs
+
+    def _read_pair_pos(self, offset: int, pairs: Dict[int, int]) -> None:
+        fmt, coverage_offset, value_format1, value_format2 = struct.unpack(">HHHH", self.data[offset : offset + 8])
+        if not value_format1 & 0x0004:
+            return
+        # XAdvance follows XPlacement/YPlacement when those are present.
+        x_advance = bin(value_format1 & 0x0003).count("1") * 2
+        record1_size = bin(value_format1).count("1") * 2
+        record2_size = bin(value_format2).count("1") * 2
+        first_glyphs = self._read_coverage(offset + coverage_offset)
+
+        if fmt == 1:
+            set_count = struct.unpack(">H", self.data[offset + 8 : offset + 10])[0]
+            set_offsets = struct.unpack(">" + "H" * set_count, self.data[offset + 10 : offset + 10 + set_count * 2])
+            stride = 2 + record1_size + record2_size
+            for left, set_offset in zip(first_glyphs, set_offsets):
+                pos = offset + set_offset
+                count = struct.unpack(">H", self.data[pos : pos + 2])[0]
+                pos += 2
+                for _ in range(count):
+                    right = struct.unpack(">H", self.data[pos : pos + 2])[0]
+                    value = struct.unpack(">h", self.data[pos + 2 + x_advance : pos + 4 + x_advance])[0]
+                    key = left << 16 | right
+                    if value and key not in pairs:
+                        pairs[key] = value
+                    pos += stride
+            return
+
+        if fmt != 2:
+            return
+        class_def1, class_def2, class1_count, class2_count = struct.unpack(
+            ">HHHH", self.data[offset + 8 : offset + 16]
+        )
+        first_classes = self._read_class_def(offset + class_def1)
+        second_classes = self._read_class_def(offset + class_def2)
+        members: Dict[int, List[int]] = {}
+        for gid, cls in second_classes.items():
+            members.setdefault(cls, []).append(gid)
+
+        stride = record1_size + record2_size
+        records = offset + 16
+        values: List[List[int]] = []
+        for c1 in range(class1_count):
+            row = records + c1 * class2_count * stride + x_advance
+            values.append(
+                [struct.unpack(">h", self.data[row + c2 * stride : row + c2 * stride + 2])[0] for c2 in range(class2_count)]
+            )
+        for left in first_glyphs:
+            row = values[first_classes.get(left, 0)]
+            for c2, value in enumerate(row):
+                if not value:
+                    continue
+                if c2 == 0:
+                    rights: Iterable[int] = (g for g in range(self.num_glyphs) if g not in second_classes)
+                else:
+                    rights = members.get(c2, ())
+                for right in rights:
+                    key = left << 16 | right
+                    if key not in pairs:
+                        pairs[key] = value
+
     def glyph_width(self, gid: int) -> float:
         return self.advance_widths.get(gid, 0) * 1000 / self.units_per_em
 
-    def encode_text(self, text: str) -> str:
+    def encode_text(self, text: str, glyphs: Dict[int, int]) -> str:
         """
-        Encode to Identity-H with 2-byte glyph IDs (CID = GID).
-        Also record an intended GID->Unicode mapping for ToUnicode.
+        Encode to Identity-H with 2-byte glyph IDs (CID = GID), as a TJ array with
+        pair kerning applied. The font itself is not touched: each GID used is recorded
+        in `glyphs` with the Unicode codepoint first intended for it, for merging later
+        via record_glyphs.
         """
-        hex_bytes = []
+        kerning = self.kerning
+        scale = 1000 / self.units_per_em
+        parts: List[str] = []
+        hex_bytes: List[str] = []
+        prev = 0
         for ch in text:
             codepoint = ord(ch)
             gid = self.cmap.get(codepoint, 0)
-            self.used_gids.add(gid)
+            if gid not in glyphs:
+                glyphs[gid] = codepoint
+            kern = kerning.get(prev << 16 | gid, 0) if prev and gid else 0
+            if kern:
+                # TJ numbers are subtracted from the advance, so tightening is positive.
+                parts.append("<" + "".join(hex_bytes) + ">")
+                parts.append(f"{-kern * scale:.2f}")
+                hex_bytes = []
+            hex_bytes.append(f"{gid:04X}")
+            prev = gid
+        parts.append("<" + "".join(hex_bytes) + ">")
+        return "[" + " ".join(parts) + "]"
+
+    def record_glyphs(self, glyphs: Dict[int, int]) -> None:
+        """Merge a glyph set from encode_text into used_gids and the ToUnicode mapping."""
+        self.used_gids.update(glyphs)
+        for gid, codepoint in glyphs.items():
             if gid != 0 and gid not in self.gid_to_unicode:
                 self.gid_to_unicode[gid] = codepoint
-            hex_bytes.append(f"{gid:04X}")
-        return "<" + "".join(hex_bytes) + ">"
 
     def text_width(self, text: str, size: float) -> float:
+        kerning = self.kerning
         total = 0.0
+        kern_total = 0
+        prev = 0
         for ch in text:
             gid = self.cmap.get(ord(ch), 0)
             total += self.glyph_width(gid)
+            if prev and gid:
+                kern_total += kerning.get(prev << 16 | gid, 0)
+            prev = gid
+        total += kern_total * 1000 / self.units_per_em
         return total * size / 1000
 
 
+# -----------------------------
+# Minimal PDF reader (page import)
+# -----------------------------
+class PDFRef(NamedTuple):
+    num: int
+    gen: int
+
+
+class PDFString(NamedTuple):
+    """A literal or hex string, kept as its raw source token so it round-trips exactly."""
+
+    raw: bytes
+
+
+_SKIP = re.compile(rb"(?:[\x00\t\n\x0c\r ]+|%[^\r\n]*)*")
+_NAME = re.compile(rb"/[^\x00\t\n\x0c\r ()<>\[\]{}/%]*")
+_NUMBER = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+_REF_TAIL = re.compile(rb"[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+R(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])")
+_KEYWORD = re.compile(rb"[A-Za-z]+")
+_OBJ_HEADER = re.compile(rb"[\x00\t\n\x0c\r ]*(\d+)[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+obj")
+_XREF_SUBSECTION = re.compile(rb"[\x00\t\n\x0c\r ]*(\d+)[\x00\t\n\x0c\r ]+(\d+)")
+_XREF_ENTRY = re.compile(rb"[\x00\t\n\x0c\r ]*(\d+)[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+([nf])")
+_ENDSTREAM = re.compile(rb"[\x00\t\n\x0c\r ]*endstream")
+INHERITABLE_PAGE_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def _parse_value(buf: Any, pos: int) -> Tuple[Any, int]:
+    """
+    Parse one PDF value at `pos` from bytes or an mmap. Dictionaries become dicts keyed
+    by name (leading slash kept), names become str, references become PDFRef.
+    """
+    pos = _SKIP.match(buf, pos).end()
+    lead = buf[pos : pos + 1]
+    if lead == b"<":
+        if buf[pos + 1 : pos + 2] == b"<":
+            result: Dict[str, Any] = {}
+            pos += 2
+            while True:
+                pos = _SKIP.match(buf, pos).end()
+                if buf[pos : pos + 2] == b">>":
+                    return result, pos + 2
+                key, pos = _parse_value(buf, pos)
+                result[key], pos = _parse_value(buf, pos)
+        end = buf.find(b">", pos) + 1
+        return PDFString(bytes(buf[pos:end])), end
+    if lead == b"[":
+        items: List[Any] = []
+        pos += 1
+        while True:
+            pos = _SKIP.match(buf, pos).end()
+            if buf[pos : pos + 1] == b"]":
+                return items, pos + 1
+            item, pos = _parse_value(buf, pos)
+            items.append(item)
+    if lead == b"(":
+        depth = 0
+        end = pos
+        while True:
+            ch = buf[end]
+            if ch == 0x5C:  # backslash escapes the next byte
+                end += 2
+                continue
+            if ch == 0x28:
+                depth += 1
+            elif ch == 0x29:
+                depth -= 1
+                if depth == 0:
+                    return PDFString(bytes(buf[pos : end + 1])), end + 1
+            end += 1
+    if lead == b"/":
+        match = _NAME.match(buf, pos)
+        return match.group().decode("latin-1"), match.end()
+    match = _NUMBER.match(buf, pos)
+    if match:
+        token = match.group()
+        if b"." in token:
+            return float(token), match.end()
+        ref = _REF_TAIL.match(buf, match.end())
+        if ref:
+            return PDFRef(int(token), int(ref.group(1))), ref.end()
+        return int(token), match.end()
+    match = _KEYWORD.match(buf, pos)
+    if match and match.group() in (b"true", b"false", b"null"):
+        return {b"true": True, b"false": False, b"null": None}[match.group()], match.end()
+    raise ValueError(f"Unexpected PDF token at offset {pos}: {bytes(buf[pos : pos + 16])!r}")
+
+
+def _pdf_value(value: Any, ref: Callable[[PDFRef], int]) -> bytes:
+    """Serialize a parsed value, mapping each reference to an output object number."""
+    if isinstance(value, dict):
+        return b"<< " + b" ".join(key.encode("latin-1") + b" " + _pdf_value(v, ref) for key, v in value.items()) + b" >>"
+    if isinstance(value, list):
+        return b"[" + b" ".join(_pdf_value(item, ref) for item in value) + b"]"
+    if isinstance(value, PDFRef):
+        return b"%d 0 R" % ref(value)
+    if isinstance(value, PDFString):
+        return value.raw
+    if isinstance(value, bool):
+        return b"true" if value else b"false"
+    if value is None:
+        return b"null"
+    if isinstance(value, float):
+        text = repr(value)
+        if "e" in text:
+            text = f"{value:.10f}".rstrip("0").rstrip(".")
+        return text.encode("ascii")
+    if isinstance(value, int):
+        return str(value).encode("ascii")
+    return value.encode("latin-1")  # name
+
+
+def _png_unpredict(data: bytes, columns: int, bpp: int) -> bytes:
+    row_len = columns + 1
+    output = bytearray()
+    prev = bytearray(columns)
+    for start in range(0, len(data), row_len):
+        kind = data[start]
+        row = bytearray(data[start + 1 : start + row_len])
+        for i in range(len(row)):
+            left = row[i - bpp] if i >= bpp else 0
+            up = prev[i]
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + (left + up) // 2) & 0xFF
+            elif kind == 4:
+                up_left = prev[i - bpp] if i >= bpp else 0
+                estimate = left + up - up_left
+                pa, pb, pc = abs(estimate - left), abs(estimate - up), abs(estimate - up_left)
+                row[i] = (row[i] + (left if pa <= pb and pa <= pc else up if pb <= pc else up_left)) & 0xFF
+        output += row
+        prev = row
+    return bytes(output)
+
+
+class PDFReader:
+    """
+    Read-only access to an existing PDF, memory-mapped so imports touch only the bytes
+    they need. Handles xref tables, xref streams (incremental updates via /Prev) and
+    object streams; encrypted files are rejected.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = path.open("rb")
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # obj num -> (1, offset, gen) for plain objects, (2, objstm num, index) for compressed ones
+        self.xref: Dict[int, Tuple[int, int, int]] = {}
+        self.trailer: Dict[str, Any] = {}
+        self._object_streams: Dict[int, Tuple[bytes, List[int]]] = {}
+        self._read_xref()
+        if "/Encrypt" in self.trailer:
+            raise ValueError(f"{path}: encrypted PDFs are not supported")
+        self.pages = self._read_pages()
+
+    def close(self) -> None:
+        self.data.close()
+        self._file.close()
+
+    def __enter__(self) -> PDFReader:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _read_xref(self) -> None:
+        tail_start = max(0, len(self.data) - 1024)
+        marker = self.data.rfind(b"startxref", tail_start)
+        if marker < 0:
+            raise ValueError(f"{self.path}: startxref not found")
+        offset: Optional[int] = _parse_value(self.data, marker + 9)[0]
+        seen: set[int] = set()
+        while offset is not None and offset not in seen:
+            seen.add(offset)
+            trailer = self._read_xref_section(offset)
+            if "/XRefStm" in trailer:
+                self._read_xref_section(trailer["/XRefStm"])
+            for key, value in trailer.items():
+                self.trailer.setdefault(key, value)
+            offset = trailer.get("/Prev")
+
+    def _read_xref_section(self, offset: int) -> Dict[str, Any]:
+        """Read one xref table or stream; entries already known (from newer sections) win."""
+        pos = _SKIP.match(self.data, offset).end()
+        if self.data[pos : pos + 4] == b"xref":
+            pos += 4
+            while True:
+                pos = _SKIP.match(self.data, pos).end()
+                if self.data[pos : pos + 7] == b"trailer":
+                    return _parse_value(self.data, pos + 7)[0]
+                match = _XREF_SUBSECTION.match(self.data, pos)
+                first, count = int(match.group(1)), int(match.group(2))
+                pos = match.end()
+                for num in range(first, first + count):
+                    entry = _XREF_ENTRY.match(self.data, pos)
+                    pos = entry.end()
+                    if entry.group(3) == b"n" and num not in self.xref:
+                        self.xref[num] = (1, int(entry.group(1)), int(entry.group(2)))
+
+        value, raw = self._read_indirect(pos)
+        data = self._decode(value, raw)
+        widths = value["/W"]
+        index = value.get("/Index", [0, value["/Size"]])
+        row_len = sum(widths)
+        row = 0
+        for first, count in zip(index[::2], index[1::2]):
+            for num in range(first, first + count):
+                fields = []
+                pos = row * row_len
+                for width in widths:
+                    fields.append(int.from_bytes(data[pos : pos + width], "big"))
+                    pos += width
+                row += 1
+                kind = fields[0] if widths[0] else 1
+                if kind in (1, 2) and num not in self.xref:
+                    self.xref[num] = (kind, fields[1], fields[2])
+        return value
+
+    def _read_indirect(self, offset: int) -> Tuple[Any, Optional[bytes]]:
+        header = _OBJ_HEADER.match(self.data, offset)
+        if not header:
+            raise ValueError(f"{self.path}: no object at offset {offset}")
+        value, pos = _parse_value(self.data, header.end())
+        pos = _SKIP.match(self.data, pos).end()
+        if self.data[pos : pos + 6] != b"stream":
+            return value, None
+        pos += 6
+        if self.data[pos : pos + 2] == b"\r\n":
+            pos += 2
+        elif self.data[pos : pos + 1] in (b"\n", b"\r"):
+            pos += 1
+        end = pos + self.resolve(value.get("/Length", 0))
+        if not _ENDSTREAM.match(self.data, end):
+            # Wrong /Length: fall back to the endstream keyword, minus its end-of-line marker.
+            end = self.data.find(b"endstream", pos)
+            while self.data[end - 1 : end] in (b"\n", b"\r"):
+                end -= 1
+        return value, self.data[pos:end]
+
+    def _decode(self, value: Dict[str, Any], data: bytes) -> bytes:
+        """Decode FlateDecode (with PNG predictors); only needed for xref, object and split content streams."""
+        filters = self.resolve(value.get("/Filter", []))
+        params = self.resolve(value.get("/DecodeParms"))
+        if not isinstance(filters, list):
+            filters, params = [filters], [params]
+        elif not isinstance(params, list):
+            params = [params] * len(filters)
+        for name, param in zip(filters, params):
+            if name != "/FlateDecode":
+                raise ValueError(f"{self.path}: unsupported filter {name}")
+            data = zlib.decompress(data)
+            param = self.resolve(param) or {}
+            if param.get("/Predictor", 1) >= 10:
+                bpp = max(1, param.get("/Colors", 1) * param.get("/BitsPerComponent", 8) // 8)
+                data = _png_unpredict(data, param.get("/Columns", 1) * bpp, bpp)
+        return data
+
+    def _object_stream(self, num: int) -> Tuple[bytes, List[int]]:
+        cached = self._object_streams.get(num)
+        if cached is None:
+            value, raw = self.get_object(num)
+            data = self._decode(value, raw)
+            offsets: List[int] = []
+            pos = 0
+            for _ in range(value["/N"]):
+                _, pos = _parse_value(data, pos)
+                offset, pos = _parse_value(data, pos)
+                offsets.append(value["/First"] + offset)
+            cached = self._object_streams[num] = (data, offsets)
+        return cached
+
+    def get_object(self, num: int) -> Tuple[Any, Optional[bytes]]:
+        """Return an object's value and, for streams, its still-encoded data."""
+        entry = self.xref.get(num)
+        if entry is None:
+            return None, None
+        kind, location, index = entry
+        if kind == 2:
+            data, offsets = self._object_stream(location)
+            return _parse_value(data, offsets[index])[0], None
+        return self._read_indirect(location)
+
+    def resolve(self, value: Any) -> Any:
+        while isinstance(value, PDFRef):
+            value = self.get_object(value.num)[0]
+        return value
+
+    def _read_pages(self) -> List[Dict[str, Any]]:
+        """Flatten the page tree into page dictionaries with inherited attributes filled in."""
+        root = self.resolve(self.trailer["/Root"])
+        pages: List[Dict[str, Any]] = []
+        stack: List[Tuple[Any, Dict[str, Any]]] = [(root["/Pages"], {})]
+        seen: set[int] = set()
+        while stack:
+            node_ref, inherited = stack.pop()
+            if isinstance(node_ref, PDFRef):
+                if node_ref.num in seen:
+                    continue
+                seen.add(node_ref.num)
+            node = self.resolve(node_ref)
+            if "/Kids" in node:
+                attrs = dict(inherited)
+                attrs.update((key, node[key]) for key in INHERITABLE_PAGE_KEYS if key in node)
+                stack.extend((kid, attrs) for kid in reversed(self.resolve(node["/Kids"])))
+            else:
+                page = dict(inherited)
+                page.update(node)
+                pages.append(page)
+        return pages
+
+    def page_box(self, index: int) -> List[float]:
+        page = self.pages[index]
+        box = self.resolve(page.get("/CropBox", page.get("/MediaBox")))
+        return [self.resolve(v) for v in box]
+
+    def page_content(self, index: int) -> Tuple[Dict[str, Any], bytes]:
+        """
+        The page's content as stream dictionary entries (/Filter, /DecodeParms) plus data.
+        A single content stream comes back still encoded; a /Contents array has to be
+        decoded and joined, since encoded streams cannot simply be concatenated.
+        """
+        contents = self.pages[index].get("/Contents")
+        if contents is None:
+            return {}, b""
+        value, data = self.get_object(contents.num) if isinstance(contents, PDFRef) else (contents, None)
+        if data is not None:
+            return {key: value[key] for key in ("/Filter", "/DecodeParms") if key in value}, data
+        parts = [self.get_object(part.num) for part in value]
+        return {}, b"\n".join(self._decode(part, raw) if "/Filter" in part else raw for part, raw in parts)
+
+
 # -----------------------------
 # PDF writer (objects + xref)
 # -----------------------------
+PDF_HEADER = b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"
+REF_PATTERN = re.compile(rb"(\d+) 0 R")
+PARENT_PATTERN = re.compile(rb"/Parent \d+ 0 R")
+CONTENTS_PATTERN = re.compile(rb"/Contents (\d+) 0 R")
+
+
+def _split_stream(obj: bytes) -> Tuple[bytes, bytes]:
+    """Split an object into its dictionary part and (possibly empty) stream part."""
+    head, sep, tail = obj.partition(b"stream\n")
+    return head, sep + tail
+
+
+def _renumber(obj: bytes, mapping: Dict[int, int]) -> bytes:
+    """Rewrite indirect references in the dictionary part only; stream data is left untouched."""
+    head, stream = _split_stream(obj)
+    head = REF_PATTERN.sub(lambda m: b"%d 0 R" % mapping.get(int(m.group(1)), int(m.group(1))), head)
+    return head + stream
+
+
+def _serialize(num: int, obj: bytes) -> bytes:
+    return f"{num} 0 obj\n".encode("ascii") + obj + b"\nendobj\n"
+
+
+class _BitWriter:
+    """Big-endian bit packer for hint tables."""
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.acc = 0
+        self.nbits = 0
+
+    def write(self, value: int, bits: int) -> None:
+        if bits == 0:
+            return
+        self.acc = (self.acc << bits) | value
+        self.nbits += bits
+        while self.nbits >= 8:
+            self.nbits -= 8
+            self.buffer.append((self.acc >> self.nbits) & 0xFF)
+        self.acc &= (1 << self.nbits) - 1
+
+    def write_column(self, values: List[int], bits: int) -> None:
+        """Write one hint item for every page/group; each item column starts on a byte boundary."""
+        for value in values:
+            self.write(value, bits)
+        self.flush()
+
+    def flush(self) -> None:
+        if self.nbits:
+            self.write(0, 8 - self.nbits)
+
+    def getvalue(self) -> bytes:
+        self.flush()
+        return bytes(self.buffer)
+
+
+def _bits_for_spread(values: List[int]) -> int:
+    return (max(values) - min(values)).bit_length()
+
+
+def _hint_stream(
+    body: Dict[int, bytes],
+    offsets: Dict[int, int],
+    sections: List[List[int]],
+    shared_refs: List[List[int]],
+    groups: List[int],
+    shared_section: List[int],
+) -> bytes:
+    """
+    Primary hint stream: page offset hint table (Annex F.4.1) followed by the shared
+    object hint table (F.4.2). `groups` lists the shared object entries, first-page
+    objects first, one object per group; `shared_refs` holds indices into it per page.
+    """
+    counts = [len(section) for section in sections]
+    starts = [offsets[section[0]] for section in sections]
+    lengths = [offsets[section[-1]] + len(body[section[-1]]) - start for section, start in zip(sections, starts)]
+    content_offsets: List[int] = []
+    content_lengths: List[int] = []
+    for section, start in zip(sections, starts):
+        match = CONTENTS_PATTERN.search(_split_stream(body[section[0]])[0])
+        content = int(match.group(1)) if match else 0
+        content_offsets.append(offsets[content] - start if content in offsets else 0)
+        content_lengths.append(len(body[content]) if content in body else 0)
+    ref_counts = [len(refs) for refs in shared_refs]
+    ref_bits = max(ref_counts).bit_length()
+    id_bits = max((idx for refs in shared_refs for idx in refs), default=0).bit_length()
+
+    page_table = _BitWriter()
+    for value, width in (
+        (min(counts), 32),
+        (starts[0], 32),
+        (_bits_for_spread(counts), 16),
+        (min(lengths), 32),
+        (_bits_for_spread(lengths), 16),
+        (min(content_offsets), 32),
+        (_bits_for_spread(content_offsets), 16),
+        (min(content_lengths), 32),
+        (_bits_for_spread(content_lengths), 16),
+        (ref_bits, 16),
+        (id_bits, 16),
+        (0, 16),  # no fractional positions for shared references
+        (1, 16),
+    ):
+        page_table.write(value, width)
+    page_table.write_column([n - min(counts) for n in counts], _bits_for_spread(counts))
+    page_table.write_column([n - min(lengths) for n in lengths], _bits_for_spread(lengths))
+    page_table.write_column(ref_counts, ref_bits)
+    page_table.write_column([idx for refs in shared_refs for idx in refs], id_bits)
+    page_table.write_column(
+        [n - min(content_offsets) for n in content_offsets], _bits_for_spread(content_offsets)
+    )
+    page_table.write_column(
+        [n - min(content_lengths) for n in content_lengths], _bits_for_spread(content_lengths)
+    )
+
+    group_lengths = [len(body[num]) for num in groups]
+    shared_table = _BitWriter()
+    for value, width in (
+        (shared_section[0] if shared_section else 0, 32),
+        (offsets[shared_section[0]] if shared_section else 0, 32),
+        (len(sections[0]), 32),
+        (len(groups), 32),
+        (0, 16),  # every group holds a single object
+        (min(group_lengths), 32),
+        (_bits_for_spread(group_lengths), 16),
+    ):
+        shared_table.write(value, width)
+    shared_table.write_column([n - min(group_lengths) for n in group_lengths], _bits_for_spread(group_lengths))
+    shared_table.write_column([0] * len(groups), 1)  # no MD5 signatures
+
+    page_data = page_table.getvalue()
+    data = page_data + shared_table.getvalue()
+    return f"<< /Length {len(data)} /S {len(page_data)} >>\nstream\n".encode("ascii") + data + b"\nendstream"
+
+
 class PDFWriter:
     def __init__(self) -> None:
         self.objects: List[bytes] = []
+        # (source file, source obj num) -> output obj num, so imported resources are copied once
+        self.imported: Dict[Tuple[Path, int], int] = {}
+        self.imported_pages: Dict[Tuple[Path, int], int] = {}
 
     def add_object(self, content: bytes) -> int:
         self.objects.append(content)
         return len(self.objects)
 
+    def splice(self, objects: List[bytes]) -> int:
+        """
+        Append objects built by another writer, shifting their internal references.
+        Returns the offset to add to the other writer's object numbers.
+        """
+        base = len(self.objects)
+        mapping = {num: num + base for num in range(1, len(objects) + 1)}
+        self.objects.extend(_renumber(obj, mapping) for obj in objects)
+        return base
+
+    def _import_object(self, reader: PDFReader, ref: PDFRef) -> int:
+        key = (reader.path, ref.num)
+        if key in self.imported:
+            return self.imported[key]
+        # Reserve the number first so reference cycles resolve to it.
+        num = self.add_object(b"")
+        self.imported[key] = num
+        value, data = reader.get_object(ref.num)
+        if data is None:
+            self.objects[num - 1] = _pdf_value(value, lambda r: self._import_object(reader, r))
+        else:
+            value = {**value, "/Length": len(data)}
+            self.objects[num - 1] = (
+                _pdf_value(value, lambda r: self._import_object(reader, r)) + b"\nstream\n" + data + b"\nendstream"
+            )
+        return num
+
+    def import_page(self, reader: PDFReader, index: int) -> int:
+        """
+        Copy page `index` of `reader` in as a Form XObject and return its object number.
+        Content and resource streams are copied byte-for-byte, still encoded, and
+        everything reached from the resources is imported once per source file, so
+        fonts and images shared between pages are written only once.
+        """
+        key = (reader.path, index)
+        if key in self.imported_pages:
+            return self.imported_pages[key]
+        entries, data = reader.page_content(index)
+        form: Dict[str, Any] = {
+            "/Type": "/XObject",
+            "/Subtype": "/Form",
+            "/BBox": reader.page_box(index),
+            "/Resources": reader.pages[index].get("/Resources", {}),
+            **entries,
+            "/Length": len(data),
+        }
+        num = self.add_object(
+            _pdf_value(form, lambda r: self._import_object(reader, r)) + b"\nstream\n" + data + b"\nendstream"
+        )
+        self.imported_pages[key] = num
+        return num
+
     def build(self, root_obj: int) -> bytes:
-        output = [b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"]
+        output = [PDF_HEADER]
         offsets = [0]
         for idx, obj in enumerate(self.objects, start=1):
             offsets.append(sum(len(chunk) for chunk in output))
@@ -221,23 +935,177 @@ class PDFWriter:
         )
         return b"".join(output)
 
+    def _closure(self, start: int, stop: set[int]) -> List[int]:
+        """Objects reachable from `start` (ignoring /Parent) in breadth-first order, skipping `stop`."""
+        order = [start]
+        seen = {start} | stop
+        for num in order:
+            head, _ = _split_stream(self.objects[num - 1])
+            for ref in REF_PATTERN.findall(PARENT_PATTERN.sub(b"", head)):
+                ref_num = int(ref)
+                if ref_num not in seen:
+                    seen.add(ref_num)
+                    order.append(ref_num)
+        return order
+
+    def build_linearized(self, root_obj: int, page_objs: List[int]) -> bytes:
+        """
+        Write a linearized ("fast web view") file per PDF 1.7 Annex F: the linearization
+        dictionary, first-page xref, catalog, hint stream and everything page 1 needs
+        come first, so a viewer can show it before the rest of the file arrives.
+
+        Objects are reordered and renumbered: the first-page section takes the high
+        numbers, later pages (each followed by its private objects), objects shared
+        between them and the remainder take 1..k in file order. The linearization
+        dictionary and first-page xref are fixed-width, so a second pass can fill in
+        offsets without moving anything.
+        """
+        stop = set(page_objs) | {root_obj}
+        closures = [self._closure(page, stop) for page in page_objs]
+        first_page = closures[0]
+        first_set = set(first_page)
+
+        later_pages = [[num for num in objs if num not in first_set] for objs in closures[1:]]
+        users: Dict[int, int] = {}
+        for objs in later_pages:
+            for num in objs[1:]:
+                users[num] = users.get(num, 0) + 1
+        page_sections = [first_page] + [[objs[0]] + [n for n in objs[1:] if users[n] == 1] for objs in later_pages]
+        shared = list(dict.fromkeys(n for objs in later_pages for n in objs[1:] if users[n] > 1))
+        placed = set(shared) | {root_obj}.union(*page_sections)
+        others = [num for num in range(1, len(self.objects) + 1) if num not in placed]
+
+        main_order = [num for section in page_sections[1:] for num in section] + shared + others
+        mapping = {old: new for new, old in enumerate(main_order, start=1)}
+        main_count = len(main_order)
+        lin_num = main_count + 1
+        mapping[root_obj] = main_count + 2
+        hint_num = main_count + 3
+        for new, old in enumerate(first_page, start=main_count + 4):
+            mapping[old] = new
+        total = main_count + 4 + len(first_page)
+
+        body = {new: _serialize(new, _renumber(self.objects[old - 1], mapping)) for old, new in mapping.items()}
+        sections = [[mapping[num] for num in section] for section in page_sections]
+        shared_section = [mapping[num] for num in shared]
+        groups = sections[0] + shared_section
+        group_ids = {num: idx for idx, num in enumerate(groups)}
+        shared_refs = [[]] + [
+            sorted(group_ids[mapping[num]] for num in objs if mapping[num] in group_ids)
+            for objs in closures[1:]
+        ]
+        file_order = [lin_num, mapping[root_obj], hint_num] + sections[0] + list(range(1, main_count + 1))
+
+        def lin_dict(values: Dict[str, int]) -> bytes:
+            fields = " ".join(f"/{key} {values.get(key, 0):<10}" for key in ("L", "E", "N", "O", "T"))
+            hint = f"/H [{values.get('HO', 0):<10} {values.get('HL', 0):<10}]"
+            return _serialize(lin_num, f"<< /Linearized 1 {fields} {hint} >>".encode("ascii"))
+
+        def first_xref(offsets: Dict[int, int], prev: int) -> bytes:
+            lines = [f"xref\n{lin_num} {total - lin_num}\n"]
+            lines.extend(f"{offsets.get(num, 0):010d} 00000 n \n" for num in range(lin_num, total))
+            lines.append(
+                f"trailer\n<< /Size {total} /Root {mapping[root_obj]} 0 R /Prev {prev:<10} >>\nstartxref\n0\n%%EOF\n"
+            )
+            return "".join(lines).encode("ascii")
+
+        def layout(hint: bytes, values: Dict[str, int], known: Dict[int, int]) -> Tuple[bytes, Dict[int, int], int]:
+            output = [PDF_HEADER]
+            offsets: Dict[int, int] = {}
+            pos = len(PDF_HEADER)
+            first_xref_offset = 0
+            for num in file_order:
+                chunk = lin_dict(values) if num == lin_num else hint if num == hint_num else body[num]
+                offsets[num] = pos
+                output.append(chunk)
+                pos += len(chunk)
+                if num == lin_num:
+                    first_xref_offset = pos
+                    chunk = first_xref(known, values.get("Prev", 0))
+                    output.append(chunk)
+                    pos += len(chunk)
+            main_xref = pos
+            output.append(f"xref\n0 {main_count + 1}\n0000000000 65535 f \n".encode("ascii"))
+            output.extend(f"{offsets[num]:010d} 00000 n \n".encode("ascii") for num in range(1, main_count + 1))
+            output.append(
+                f"trailer\n<< /Size {main_count + 1} >>\nstartxref\n{first_xref_offset}\n%%EOF\n".encode("ascii")
+            )
+            return b"".join(output), offsets, main_xref
+
+        # Pass 1: hint tables record offsets as if the hint stream were absent (Annex F.4).
+        _, bare, _ = layout(b"", {}, {})
+        hint = _serialize(hint_num, _hint_stream(body, bare, sections, shared_refs, groups, shared_section))
+
+        # Pass 2: with the hint stream in place every offset is final; fill in the fixed-width slots.
+        draft, offsets, main_xref = layout(hint, {}, {})
+        last = sections[0][-1]
+        values = {
+            "L": len(draft),
+            "E": offsets[last] + len(body[last]),
+            "N": len(page_objs),
+            "O": sections[0][0],
+            "T": main_xref + len(f"xref\n0 {main_count + 1}\n") - 1,
+            "HO": offsets[hint_num],
+            "HL": len(hint),
+            "Prev": main_xref,
+        }
+        output, _, _ = layout(hint, values, offsets)
+        return output
+
 
 # -----------------------------
 # Font objects (Type0 + CIDFontType2 + ToUnicode)
 # -----------------------------
-def build_to_unicode(font: TrueTypeFont) -> bytes:
-    # Use the recorded intended mapping, NOT a reverse-scan of font.cmap
-    entries = sorted(font.gid_to_unicode.items())  # (gid, codepoint)
+# Serialized ToUnicode streams and /W arrays, keyed by (font file, glyph set), so batch
+# renders that end up with the same glyphs skip rebuilding them.
+_TO_UNICODE_CACHE: Dict[Tuple[Path, Tuple[Tuple[int, int], ...]], bytes] = {}
+_WIDTHS_CACHE: Dict[Tuple[Path, Tuple[int, ...]], str] = {}
 
+
+def _utf16_hex(codepoint: int) -> str:
+    if codepoint < 0x10000:
+        return f"{codepoint:04X}"
+    codepoint -= 0x10000
+    return f"{0xD800 | codepoint >> 10:04X}{0xDC00 | codepoint & 0x3FF:04X}"
+
+
+def _bf_blocks(kind: str, lines: List[str]) -> List[str]:
     blocks: List[str] = []
-    for i in range(0, len(entries), 100):
-        chunk = entries[i : i + 100]
-        block = f"{len(chunk)} beginbfchar\n"
-        for gid, codepoint in chunk:
-            # BMP only; fine for this document’s character set
-            block += f"<{gid:04X}> <{codepoint:04X}>\n"
-        block += "endbfchar\n"
-        blocks.append(block)
+    for i in range(0, len(lines), 100):
+        chunk = lines[i : i + 100]
+        blocks.append(f"{len(chunk)} begin{kind}\n" + "".join(chunk) + f"end{kind}\n")
+    return blocks
+
+
+def build_to_unicode(font: TrueTypeFont) -> bytes:
+    # Use the recorded intended mapping, NOT a reverse-scan of font.cmap
+    entries = tuple(sorted(font.gid_to_unicode.items()))  # (gid, codepoint)
+    key = (font.path, entries)
+    cached = _TO_UNICODE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    # Coalesce runs where GID and codepoint both step by one. A bfrange may only vary the
+    # last byte of its source and destination, so runs also break at those byte boundaries.
+    chars: List[str] = []
+    ranges: List[str] = []
+    i = 0
+    while i < len(entries):
+        gid, codepoint = entries[i]
+        j = i + 1
+        while (
+            j < len(entries)
+            and entries[j][0] == gid + (j - i)
+            and entries[j][1] == codepoint + (j - i)
+            and entries[j][0] & 0xFF != 0
+            and (codepoint + (j - i)) & 0xFF != 0
+        ):
+            j += 1
+        if j - i > 1:
+            ranges.append(f"<{gid:04X}> <{entries[j - 1][0]:04X}> <{_utf16_hex(codepoint)}>\n")
+        else:
+            chars.append(f"<{gid:04X}> <{_utf16_hex(codepoint)}>\n")
+        i = j
 
     cmap = (
         "/CIDInit /ProcSet findresource begin\n"
@@ -249,14 +1117,60 @@ def build_to_unicode(font: TrueTypeFont) -> bytes:
         "1 begincodespacerange\n"
         "<0000> <FFFF>\n"
         "endcodespacerange\n"
-        + "".join(blocks)
+        + "".join(_bf_blocks("bfchar", chars))
+        + "".join(_bf_blocks("bfrange", ranges))
         + "endcmap\n"
         "CMapName currentdict /CMap defineresource pop\n"
         "end\n"
         "end\n"
     ).encode("ascii")
 
-    return b"<< /Length " + str(len(cmap)).encode("ascii") + b" >>\nstream\n" + cmap + b"\nendstream"
+    stream = b"<< /Length " + str(len(cmap)).encode("ascii") + b" >>\nstream\n" + cmap + b"\nendstream"
+    _TO_UNICODE_CACHE[key] = stream
+    return stream
+
+
+def build_widths(font: TrueTypeFont) -> str:
+    """
+    /W array for the used glyphs: `c_first c_last w` for runs of three or more equal
+    widths, `c [w1 w2 ...]` for everything else.
+    """
+    used = tuple(sorted(gid for gid in font.used_gids if gid != 0))
+    key = (font.path, used)
+    cached = _WIDTHS_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    parts: List[str] = []
+    pending: List[str] = []
+    pending_start = 0
+
+    def flush_pending() -> None:
+        if pending:
+            parts.append(f"{pending_start} [" + " ".join(pending) + "]")
+            pending.clear()
+
+    i = 0
+    while i < len(used):
+        width = f"{font.glyph_width(used[i]):.2f}"
+        j = i + 1
+        while j < len(used) and used[j] == used[j - 1] + 1 and f"{font.glyph_width(used[j]):.2f}" == width:
+            j += 1
+        if j - i >= 3:
+            flush_pending()
+            parts.append(f"{used[i]} {used[j - 1]} {width}")
+        else:
+            for gid in used[i:j]:
+                if not pending or gid != pending_start + len(pending):
+                    flush_pending()
+                    pending_start = gid
+                pending.append(f"{font.glyph_width(gid):.2f}")
+        i = j
+    flush_pending()
+
+    widths_value = " ".join(parts)
+    _WIDTHS_CACHE[key] = widths_value
+    return widths_value
 
 
 def font_objects(font: TrueTypeFont, alias: str) -> Tuple[int, int, int, int, int, List[bytes]]:
@@ -289,21 +1203,7 @@ def font_objects(font: TrueTypeFont, alias: str) -> Tuple[int, int, int, int, in
     )
     font_descriptor_obj = writer.add_object(font_descriptor)
 
-    used = sorted(gid for gid in font.used_gids if gid != 0)
-    widths_parts: List[str] = []
-    if used:
-        start = prev = used[0]
-        current_widths = [f"{font.glyph_width(start):.2f}"]
-        for gid in used[1:]:
-            if gid == prev + 1:
-                current_widths.append(f"{font.glyph_width(gid):.2f}")
-            else:
-                widths_parts.append(f"{start} [" + " ".join(current_widths) + "]")
-                start = gid
-                current_widths = [f"{font.glyph_width(gid):.2f}"]
-            prev = gid
-        widths_parts.append(f"{start} [" + " ".join(current_widths) + "]")
-    widths_value = " ".join(widths_parts)
+    widths_value = build_widths(font)
 
     cid_font = (
         b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /"
@@ -400,8 +1300,13 @@ def layout_lines(
 # -----------------------------
 # Content stream: header/footer/page nos + rules
 # -----------------------------
-def build_content_stream(
-    pages: List[List[PageItem]],
+PageGlyphs = Dict[str, Dict[int, int]]
+
+
+def build_page_stream(
+    page: List[PageItem],
+    page_index: int,
+    total_pages: int,
     fonts: Dict[str, TrueTypeFont],
     page_width: float,
     page_height: float,
@@ -409,82 +1314,132 @@ def build_content_stream(
     header_left: str,
     header_right: str,
     footer_left: str,
-) -> List[bytes]:
-    streams: List[bytes] = []
-    total_pages = len(pages)
-
+) -> Tuple[bytes, PageGlyphs]:
+    """
+    Serialize one page without touching shared state. Returns the content stream and,
+    per font key, the glyphs it used (GID -> intended codepoint, in first-use order).
+    """
+    glyphs: PageGlyphs = {key: {} for key in fonts}
     header_y = page_height - (margin * 0.65)
     footer_y = margin * 0.55
     header_rule_y = page_height - margin + 10
 
-    for page_index, page in enumerate(pages, start=1):
-        parts: List[str] = []
+    parts: List[str] = []
+
+    # ---- Header rule ----
+    parts.append("q")
+    parts.append("0 0 0 RG")     # black stroke
+    parts.append("0.6 w")        # thin line
+    parts.append(f"{margin:.2f} {header_rule_y:.2f} m")
+    parts.append(f"{(page_width - margin):.2f} {header_rule_y:.2f} l")
+    parts.append("S")
+    parts.append("Q")
+
+    # ---- Header + footer text ----
+    parts.append("BT")
+    parts.append("0 Tc")         # force normal character spacing
+
+    # Header left (bold)
+    parts.append("/F2 10 Tf")
+    parts.append(f"1 0 0 1 {margin:.2f} {header_y:.2f} Tm")
+    parts.append(f"{fonts['bold'].encode_text(header_left, glyphs['bold'])} TJ")
+
+    # Header right (regular, right-aligned)
+    parts.append("/F1 10 Tf")
+    right_w = fonts["regular"].text_width(header_right, 10)
+    parts.append(f"1 0 0 1 {(page_width - margin - right_w):.2f} {header_y:.2f} Tm")
+    parts.append(f"{fonts['regular'].encode_text(header_right, glyphs['regular'])} TJ")
+
+    # Footer left
+    parts.append("/F1 9 Tf")
+    parts.append(f"1 0 0 1 {margin:.2f} {footer_y:.2f} Tm")
+    parts.append(f"{fonts['regular'].encode_text(footer_left, glyphs['regular'])} TJ")
+
+    # Footer right: page numbering
+    page_label = f"Page {page_index} of {total_pages}"
+    pw = fonts["regular"].text_width(page_label, 9)
+    parts.append(f"1 0 0 1 {(page_width - margin - pw):.2f} {footer_y:.2f} Tm")
+    parts.append(f"{fonts['regular'].encode_text(page_label, glyphs['regular'])} TJ")
+
+    parts.append("ET")
+
+    # ---- Body text ----
+    parts.append("BT")
+    parts.append("0 Tc")
+
+    for item in page:
+        if isinstance(item, Line):
+            font_alias = "F1" if item.font_key == "regular" else "F2"
+            encoded = fonts[item.font_key].encode_text(item.text, glyphs[item.font_key])
+            parts.append(f"/{font_alias} {item.size:.2f} Tf")
+            parts.append(f"1 0 0 1 {item.x:.2f} {item.y:.2f} Tm")
+            parts.append(f"{encoded} TJ")
+
+    parts.append("ET")
 
-        # ---- Header rule ----
-        parts.append("q")
-        parts.append("0 0 0 RG")     # black stroke
-        parts.append("0.6 w")        # thin line
-        parts.append(f"{margin:.2f} {header_rule_y:.2f} m")
-        parts.append(f"{(page_width - margin):.2f} {header_rule_y:.2f} l")
-        parts.append("S")
-        parts.append("Q")
-
-        # ---- Header + footer text ----
-        parts.append("BT")
-        parts.append("0 Tc")         # force normal character spacing
-
-        # Header left (bold)
-        parts.append("/F2 10 Tf")
-        parts.append(f"1 0 0 1 {margin:.2f} {header_y:.2f} Tm")
-        parts.append(f"{fonts['bold'].encode_text(header_left)} Tj")
-
-        # Header right (regular, right-aligned)
-        parts.append("/F1 10 Tf")
-        right_w = fonts["regular"].text_width(header_right, 10)
-        parts.append(f"1 0 0 1 {(page_width - margin - right_w):.2f} {header_y:.2f} Tm")
-        parts.append(f"{fonts['regular'].encode_text(header_right)} Tj")
-
-        # Footer left
-        parts.append("/F1 9 Tf")
-        parts.append(f"1 0 0 1 {margin:.2f} {footer_y:.2f} Tm")
-        parts.append(f"{fonts['regular'].encode_text(footer_left)} Tj")
-
-        # Footer right: page numbering
-        page_label = f"Page {page_index} of {total_pages}"
-        pw = fonts["regular"].text_width(page_label, 9)
-        parts.append(f"1 0 0 1 {(page_width - margin - pw):.2f} {footer_y:.2f} Tm")
-        parts.append(f"{fonts['regular'].encode_text(page_label)} Tj")
-
-        parts.append("ET")
-
-        # ---- Body text ----
-        parts.append("BT")
-        parts.append("0 Tc")
-
-        for item in page:
-            if isinstance(item, Line):
-                font_alias = "F1" if item.font_key == "regular" else "F2"
-                encoded = fonts[item.font_key].encode_text(item.text)
-                parts.append(f"/{font_alias} {item.size:.2f} Tf")
-                parts.append(f"1 0 0 1 {item.x:.2f} {item.y:.2f} Tm")
-                parts.append(f"{encoded} Tj")
-
-        parts.append("ET")
-
-        # ---- Body rules (outside BT/ET) ----
-        for item in page:
-            if isinstance(item, Rule):
-                parts.append("q")
-                parts.append("0 0 0 RG")
-                parts.append(f"{item.thickness:.2f} w")
-                parts.append(f"{item.x1:.2f} {item.y:.2f} m")
-                parts.append(f"{item.x2:.2f} {item.y:.2f} l")
-                parts.append("S")
-                parts.append("Q")
-
-        data = "\n".join(parts).encode("ascii")
-        streams.append(b"<< /Length " + str(len(data)).encode("ascii") + b" >>\nstream\n" + data + b"\nendstream")
+    # ---- Body rules (outside BT/ET) ----
+    for item in page:
+        if isinstance(item, Rule):
+            parts.append("q")
+            parts.append("0 0 0 RG")
+            parts.append(f"{item.thickness:.2f} w")
+            parts.append(f"{item.x1:.2f} {item.y:.2f} m")
+            parts.append(f"{item.x2:.2f} {item.y:.2f} l")
+            parts.append("S")
+            parts.append("Q")
 
+    data = "\n".join(parts).encode("ascii")
+    stream = b"<< /Length " + str(len(data)).encode("ascii") + b" >>\nstream\n" + data + b"\nendstream"
+    return stream, glyphs
+
+
+# Fonts are shipped to each pool worker once, rather than pickled with every page.
+_worker_fonts: Dict[str, TrueTypeFont] = {}
+
+
+def _init_page_worker(fonts: Dict[str, TrueTypeFont]) -> None:
+    _worker_fonts.update(fonts)
+
+
+def _page_stream_job(job: Tuple) -> Tuple[bytes, PageGlyphs]:
+    page, page_index, total_pages, *rest = job
+    return build_page_stream(page, page_index, total_pages, _worker_fonts, *rest)
+
+
+def build_content_stream(
+    pages: List[List[PageItem]],
+    fonts: Dict[str, TrueTypeFont],
+    page_width: float,
+    page_height: float,
+    margin: float,
+    header_left: str,
+    header_right: str,
+    footer_left: str,
+    workers: int = 1,
+) -> List[bytes]:
+    """
+    Build every page's content stream, on a process pool when `workers` > 1, then merge
+    the per-page glyph sets into the fonts in page order. Output is byte-identical
+    whatever the worker count.
+    """
+    total_pages = len(pages)
+    layout = (page_width, page_height, margin, header_left, header_right, footer_left)
+
+    if workers > 1 and total_pages > 1:
+        jobs = [(page, page_index, total_pages, *layout) for page_index, page in enumerate(pages, start=1)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker, initargs=(fonts,)) as pool:
+            results = list(pool.map(_page_stream_job, jobs))
+    else:
+        results = [
+            build_page_stream(page, page_index, total_pages, fonts, *layout)
+            for page_index, page in enumerate(pages, start=1)
+        ]
+
+    streams: List[bytes] = []
+    for stream, glyphs in results:
+        streams.append(stream)
+        for key, font_glyphs in glyphs.items():
+            fonts[key].record_glyphs(font_glyphs)
     return streams
 
 
@@ -492,6 +1447,25 @@ def build_content_stream(
 # Main
 # -----------------------------
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the exam-style answers PDF.")
+    parser.add_argument(
+        "--linearize",
+        action="store_true",
+        help="write a linearized (fast web view) file so page 1 shows before the download finishes",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="build page content streams on this many processes (output is identical either way)",
+    )
+    parser.add_argument(
+        "--questions",
+        type=Path,
+        help="existing PDF (e.g. Qestion.pdf) whose pages are imported, unchanged, ahead of the answers",
+    )
+    args = parser.parse_args()
+
     # Codespaces usually has DejaVu here; if not: sudo apt-get install -y fonts-dejavu-core
     font_dir = Path("/usr/share/fonts/truetype/dejavu")
     fonts = {
@@ -688,7 +1662,7 @@ def main() -> None:
 
     pages = layout_lines(blocks, fonts, page_width, page_height, margin)
 
-    # Build content streams AFTER layout, so fonts.used_gids is populated.
+    # Build content streams AFTER layout; merging their glyph sets populates fonts.used_gids.
     content_streams = build_content_stream(
         pages,
         fonts,
@@ -698,6 +1672,7 @@ def main() -> None:
         header_left="Answers",
         header_right="Junior Cycle – Mathematics",
         footer_left="Candidate: ____________________",
+        workers=args.workers,
     )
 
     writer = PDFWriter()
@@ -706,13 +1681,8 @@ def main() -> None:
     reg_objs = font_objects(fonts["regular"], "DejaVuSans")
     bold_objs = font_objects(fonts["bold"], "DejaVuSans-Bold")
 
-    base_index = len(writer.objects)
-    writer.objects.extend(reg_objs[5])
-    reg_font_obj = base_index + reg_objs[0]
-
-    base_index = len(writer.objects)
-    writer.objects.extend(bold_objs[5])
-    bold_font_obj = base_index + bold_objs[0]
+    reg_font_obj = writer.splice(reg_objs[5]) + reg_objs[0]
+    bold_font_obj = writer.splice(bold_objs[5]) + bold_objs[0]
 
     # Add page content streams
     content_obj_ids: List[int] = []
@@ -721,6 +1691,24 @@ def main() -> None:
 
     # Page objects
     pages_kids: List[int] = []
+
+    # Imported question pages: each source page is drawn as a Form XObject on its own page
+    if args.questions:
+        with PDFReader(args.questions) as reader:
+            for index in range(len(reader.pages)):
+                form_obj = writer.import_page(reader, index)
+                box = " ".join(str(v) for v in reader.page_box(index))
+                rotate = reader.resolve(reader.pages[index].get("/Rotate", 0))
+                draw = b"q /Q1 Do Q"
+                draw_obj = writer.add_object(
+                    b"<< /Length " + str(len(draw)).encode("ascii") + b" >>\nstream\n" + draw + b"\nendstream"
+                )
+                page_obj = (
+                    f"<< /Type /Page /Parent 0 0 R /MediaBox [{box}] /Rotate {rotate}"
+                    f" /Resources << /XObject << /Q1 {form_obj} 0 R >> >> /Contents {draw_obj} 0 R >>"
+                ).encode("ascii")
+                pages_kids.append(writer.add_object(page_obj))
+
     for content_obj in content_obj_ids:
         page_obj = (
             b"<< /Type /Page /Parent 0 0 R /MediaBox [0 0 595.28 841.89]"
@@ -746,7 +1734,10 @@ def main() -> None:
 
     catalog_obj = writer.add_object(f"<< /Type /Catalog /Pages {pages_obj} 0 R >>".encode("ascii"))
 
-    OUTPUT_PATH.write_bytes(writer.build(catalog_obj))
+    if args.linearize:
+        OUTPUT_PATH.write_bytes(writer.build_linearized(catalog_obj, pages_kids))
+    else:
+        OUTPUT_PATH.write_bytes(writer.build(catalog_obj))
 
     if not OUTPUT_PATH.exists() or OUTPUT_PATH.stat().st_size == 0:
         raise SystemExit("Failed to write answers_exam_style.pdf")